@@ -1,2 +1,27 @@
-from .client import ArgoCDClient
-from .http import HttpClient
\ No newline at end of file
+import importlib
+
+# Public names are imported on first access, so "import argocd" stays cheap
+# for short-lived processes.
+_LAZY_ATTRS = {
+    "AppQuery": ".query",
+    "ArgoCDClient": ".client",
+    "Deadline": ".deadline",
+    "DeadlineExceeded": ".deadline",
+    "HttpClient": ".http",
+    "OperationCancelled": ".deadline",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +1,8 @@
-from .config import API_VERSION
+from . import config
 
 
 def _prefix(path: str, version: str = None) -> str:
-    ver = version or API_VERSION
+    ver = version or config.API_VERSION
     return f"/api/{ver}{path}"
 
 
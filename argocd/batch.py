@@ -0,0 +1,406 @@
+"""
+Batch job runner for ArgoCDClient operations.
+
+Usage:
+    python -m argocd.batch operations.jsonl --concurrency 8 \\
+        --checkpoint run.checkpoint --output results.jsonl
+
+Each operation is a mapping:
+    {"id": "sync-guestbook", "op": "sync",
+     "args": {"name": "guestbook", "sync_body": {"prune": true}},
+     "depends_on": ["patch-guestbook"]}
+
+Dependencies must refer to operations that appear earlier in the file, so a
+run can be streamed in file order without building the whole graph.
+
+--record/--replay capture a run's HTTP traffic and serve it back offline;
+--profile writes cProfile stats for the client calls made during the run.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .validators import validate_operation
+
+DEFAULT_CONCURRENCY = 4
+
+
+def _dispatch(client, op, args):
+    query_params = args.get("query_params") or {}
+    if op == "get":
+        return client.get_application(args["name"], query_params)
+    if op == "list":
+        return client.list_applications(query_params)
+    if op == "patch":
+        return client.patch_application(args["patch"], query_params)
+    if op == "patch-resource":
+        return client.patch_application_resource(
+            args["name"], args["patch"], query_params
+        )
+    if op == "sync":
+        return client.sync_application(args["name"], args["sync_body"])
+    if op == "wait":
+        wait_args = {k: args[k] for k in ("timeout", "interval") if k in args}
+        synced = client.wait_for_sync(args["name"], **wait_args)
+        if not synced:
+            raise Exception(
+                f"Application '{args['name']}' did not reach Synced/Healthy state."
+            )
+        return synced
+    if op == "appset-upsert":
+        return client.create_or_update_appset(args["appset_name"], args["appset_spec"])
+    raise ValueError(f"Unsupported operation '{op}'")
+
+
+def iter_operations(path):
+    """
+    Yield operations from a JSONL or YAML file. JSONL is streamed line by line;
+    YAML files must contain a list of operations and are loaded whole.
+    """
+    if path.endswith((".yaml", ".yml")):
+        import yaml
+
+        from .utils import load_yaml
+
+        with open(path) as f:
+            try:
+                operations = load_yaml(f) or []
+            except yaml.YAMLError as e:
+                raise ValueError(f"{path}: invalid YAML: {e}") from e
+        if not isinstance(operations, list):
+            raise ValueError(f"{path} must contain a list of operations.")
+        yield from operations
+        return
+
+    with open(path) as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid JSON: {e}") from e
+
+
+def validate_operations(path):
+    """
+    Validate every operation before anything is executed. Only ids are kept,
+    to check uniqueness and that dependencies point at earlier operations.
+    """
+    seen = set()
+    count = 0
+    for operation in iter_operations(path):
+        validate_operation(operation)
+        op_id = operation["id"]
+        if op_id in seen:
+            raise ValueError(f"Duplicate operation id '{op_id}'")
+        for dep in operation.get("depends_on", []):
+            if dep not in seen:
+                raise ValueError(
+                    f"'{op_id}' depends on '{dep}', which is not defined earlier."
+                )
+        seen.add(op_id)
+        count += 1
+    return count
+
+
+def load_checkpoint(path):
+    completed = set()
+    if not path or not os.path.exists(path):
+        return completed
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a torn last line; ignore it.
+                continue
+            if entry.get("status") == "ok":
+                completed.add(entry["id"])
+    return completed
+
+
+class BatchRunner:
+    """
+    Runs operations in file order, up to concurrency at a time, once their
+    dependencies have succeeded.
+
+    At most max_pending operations that are waiting on dependencies are read
+    ahead. The outcome of every id is kept until the run ends, since any
+    later operation may depend on it, so memory grows with the number of
+    operations (one small dict entry per id), not with their size.
+    """
+
+    def __init__(
+        self,
+        client,
+        output,
+        concurrency=DEFAULT_CONCURRENCY,
+        checkpoint_path=None,
+        max_pending=None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1.")
+        self.client = client
+        self.output = output
+        self.concurrency = concurrency
+        self.checkpoint_path = checkpoint_path
+        # Bound how many dependency-blocked operations are read ahead.
+        self.max_pending = max_pending or concurrency * 16
+        self._lock = threading.Lock()
+
+    def run(self, operations):
+        # id -> True (succeeded, here or in a checkpointed run) / False
+        # (failed or skipped)
+        outcomes = dict.fromkeys(load_checkpoint(self.checkpoint_path), True)
+        pending = []
+        in_flight = {}
+        summary = {"ok": 0, "error": 0, "skipped": 0, "resumed": 0}
+
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+
+                def schedule_ready():
+                    still_pending = []
+                    for operation in pending:
+                        deps = operation.get("depends_on", [])
+                        if any(outcomes.get(dep) is False for dep in deps):
+                            failed = [d for d in deps if outcomes.get(d) is False]
+                            outcomes[operation["id"]] = False
+                            summary["skipped"] += 1
+                            self._emit(
+                                {
+                                    "id": operation["id"],
+                                    "op": operation["op"],
+                                    "status": "skipped",
+                                    "error": f"dependencies failed: {failed}",
+                                }
+                            )
+                        elif (
+                            all(outcomes.get(dep) for dep in deps)
+                            and len(in_flight) < self.concurrency
+                        ):
+                            future = pool.submit(self._execute, operation)
+                            in_flight[future] = operation
+                        else:
+                            still_pending.append(operation)
+                    pending[:] = still_pending
+
+                def drain(block):
+                    if not in_flight:
+                        return
+                    done, _ = wait(
+                        list(in_flight),
+                        timeout=None if block else 0,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        in_flight.pop(future)
+                        record = future.result()
+                        ok = record["status"] == "ok"
+                        outcomes[record["id"]] = ok
+                        summary[record["status"]] += 1
+                        self._emit(record)
+                        if checkpoint:
+                            checkpoint.write(
+                                json.dumps(
+                                    {"id": record["id"], "status": record["status"]}
+                                )
+                                + "\n"
+                            )
+                            checkpoint.flush()
+
+                for operation in operations:
+                    if outcomes.get(operation["id"]):
+                        summary["resumed"] += 1
+                        continue
+                    pending.append(operation)
+                    schedule_ready()
+                    while (
+                        len(in_flight) >= self.concurrency
+                        or len(pending) >= self.max_pending
+                    ):
+                        drain(block=True)
+                        schedule_ready()
+                    drain(block=False)
+
+                while pending or in_flight:
+                    schedule_ready()
+                    drain(block=True)
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+        return summary
+
+    def _execute(self, operation):
+        start = time.time()
+        record = {"id": operation["id"], "op": operation["op"]}
+        try:
+            result = _dispatch(self.client, operation["op"], operation.get("args", {}))
+            record["status"] = "ok"
+            record["result"] = result
+        except Exception as e:
+            # The result record carries the error; nothing is logged here so
+            # the JSONL stream stays clean.
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["duration"] = round(time.time() - start, 3)
+        return record
+
+    def _emit(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="python -m argocd.batch",
+        description="Run a JSONL/YAML file of ArgoCD operations concurrently.",
+    )
+    parser.add_argument("operations", help="Path to a .jsonl, .yaml or .yml file.")
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of operations to run in parallel.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file; completed operations are skipped when re-run.",
+    )
+    parser.add_argument(
+        "-o", "--output", help="Write JSONL results here instead of stdout."
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Validate the operations file and exit.",
+    )
+    parser.add_argument("--api-url", default=os.getenv("ARGOCD_API_URL"))
+    parser.add_argument("--token", default=os.getenv("ARGOCD_AUTH_TOKEN"))
+    parser.add_argument(
+        "--verify-ssl",
+        action="store_true",
+        default=os.getenv("ARGOCD_VERIFY_SSL", "").lower() in ("1", "true", "yes"),
+    )
+    parser.add_argument("--timeout", type=int)
+    parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--record", help="Record HTTP traffic to this file.")
+    parser.add_argument(
+        "--replay", help="Serve HTTP traffic from a recording instead of the server."
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Scale recorded response times (0 disables delays).",
+    )
+    parser.add_argument(
+        "--profile", help="Write cProfile stats for client calls to this file."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+
+    try:
+        count = validate_operations(args.operations)
+    except (OSError, ValueError) as e:
+        print(f"Invalid operations file: {e}", file=sys.stderr)
+        return 2
+
+    if args.validate_only:
+        print(f"{count} operations are valid.", file=sys.stderr)
+        return 0
+
+    if args.replay:
+        from .recording import ReplayTransport
+
+        transport = ReplayTransport(args.replay, speed=args.replay_speed)
+        args.api_url = args.api_url or "http://replay"
+        args.token = args.token or "replay"
+    else:
+        transport = None
+        if not args.api_url or not args.token:
+            print("ARGOCD_API_URL and ARGOCD_AUTH_TOKEN must be set.", file=sys.stderr)
+            return 2
+
+    from .client import ArgoCDClient
+    from .config import API_REQUEST_TIMEOUT
+
+    recorder = None
+    if args.record:
+        from .recording import Recorder
+
+        recorder = Recorder(args.record)
+
+    client = ArgoCDClient(
+        api_url=args.api_url,
+        token=args.token,
+        proxies=None,
+        timeout=args.timeout or API_REQUEST_TIMEOUT,
+        verify_ssl=args.verify_ssl,
+        debug=args.debug,
+        recorder=recorder,
+        transport=transport,
+    )
+
+    profiler = None
+    if args.profile:
+        from .profiling import ClientProfiler
+
+        profiler = ClientProfiler(client).start()
+
+    output = open(args.output, "a") if args.output else sys.stdout
+    # stdout is reserved for results; client logging goes to stderr.
+    for handler in client.logger.handlers:
+        if getattr(handler, "stream", None) is sys.stdout:
+            handler.setStream(sys.stderr)
+    if not args.debug:
+        client.logger.setLevel(logging.WARNING)
+
+    try:
+        runner = BatchRunner(
+            client,
+            output,
+            concurrency=args.concurrency,
+            checkpoint_path=args.checkpoint,
+        )
+        summary = runner.run(iter_operations(args.operations))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if recorder is not None:
+            recorder.close()
+        if profiler is not None:
+            profiler.stop()
+
+    if profiler is not None:
+        profiler.dump(args.profile)
+        print(f"Client timings: {json.dumps(profiler.timings())}", file=sys.stderr)
+
+    print(f"Batch finished: {json.dumps(summary)}", file=sys.stderr)
+    if client.http.limiter is not None:
+        limiter = json.dumps(client.http.limiter.snapshot())
+        print(f"Concurrency limiter: {limiter}", file=sys.stderr)
+    return 1 if summary["error"] or summary["skipped"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import threading
+import time
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe cache whose entries expire ttl seconds after being set.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._evict()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._entries.items() if now >= exp]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            # Still full: drop the entry that expires first.
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
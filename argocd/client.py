@@ -1,16 +1,28 @@
 import copy
 import json
-import time
 from urllib.parse import urlencode
-from typing import Dict
-
-from argocd.middleware import ArgoCDResponseError
 
 from .http import HttpClient
 from .utils import build_query_items, deep_merge
-from .api_routes import app, apps, app_sync, app_manifests, appsets, app_patch_resource
+from .api_routes import (
+    app,
+    apps,
+    app_sync,
+    app_manifests,
+    appsets,
+    appset_name as appset_path,
+    app_patch_resource,
+    app_resource_tree,
+    projects,
+    project_name as project_path,
+)
+from .cache import MISSING, TTLCache
+from .health import RollupCache
 from .logger import get_logger
-from .config import API_REQUEST_TIMEOUT
+from .config import API_REQUEST_TIMEOUT, CACHE_TTL
+from .deadline import Deadline, DeadlineExceeded
+from .query import AppQuery
+from .transfer import DEFAULT_ACCEPT_ENCODING
 from .validators import validate_query_params, validate_sync_body
 
 
@@ -23,6 +35,12 @@ class ArgoCDClient:
         timeout=API_REQUEST_TIMEOUT,
         verify_ssl=False,
         debug=False,
+        accept_encoding=DEFAULT_ACCEPT_ENCODING,
+        compress_min_bytes=None,
+        cache_ttl=CACHE_TTL,
+        adaptive_concurrency=True,
+        recorder=None,
+        transport=None,
     ):
         self.api_url = api_url.rstrip("/")
         self.logger = get_logger(debug=debug)
@@ -36,9 +54,20 @@ class ArgoCDClient:
             timeout=timeout,
             verify_ssl=verify_ssl,
             logger=self.logger,
+            accept_encoding=accept_encoding,
+            compress_min_bytes=compress_min_bytes,
+            adaptive_concurrency=adaptive_concurrency,
+            recorder=recorder,
+            transport=transport,
         )
-
-    def list_applications(self, query_params: dict = None):
+        self._appset_cache = TTLCache(cache_ttl)
+        # appset name -> (spec this client last wrote, spec the server
+        # stored), oldest first
+        self._appset_applied = {}
+        self._project_cache = TTLCache(cache_ttl)
+        self.health_rollups = RollupCache()
+
+    def list_applications(self, query_params: dict = None, deadline: Deadline = None):
         query_params = query_params or {}
         validate_query_params(query_params, "list_applications")
         query_string = urlencode(build_query_items(query_params))
@@ -48,9 +77,27 @@ class ArgoCDClient:
 
         self.logger.debug(f"GET {self.api_url}{path}")
 
-        return self.http.get(path)
+        return self.http.get(path, deadline=deadline)
 
-    def get_application(self, name, query_params: dict = None) -> Dict:
+    def query_applications(
+        self, query, query_params: dict = None, deadline: Deadline = None
+    ):
+        """
+        Yield applications matching an AppQuery (or a label selector string).
+        Server-supported filters are combined with query_params, so the
+        request is never wider than either of them.
+        """
+        if not isinstance(query, AppQuery):
+            query = AppQuery(selector=query)
+
+        params = query.merge_server_params(query_params)
+        response = self.list_applications(params, deadline=deadline)
+        items = (response.get("data") or {}).get("items") or []
+        return query.filter(items)
+
+    def get_application(
+        self, name, query_params: dict = None, deadline: Deadline = None
+    ) -> dict:
         query_params = query_params or {}
         validate_query_params(query_params, "get_application")
         query_string = urlencode(build_query_items(query_params))
@@ -58,9 +105,11 @@ class ArgoCDClient:
         if query_string:
             path += f"?{query_string}"
 
-        return self.http.get(path)
+        return self.http.get(path, deadline=deadline)
 
-    def get_application_manifests(self, name, query_params: dict = None):
+    def get_application_manifests(
+        self, name, query_params: dict = None, deadline: Deadline = None
+    ):
         query_params = query_params or {}
         validate_query_params(query_params, "get_manifests")
         query_string = urlencode(build_query_items(query_params))
@@ -69,7 +118,7 @@ class ArgoCDClient:
             path += f"?{query_string}"
 
         self.logger.info(f"Getting manifests for application '{name}'")
-        return self.http.get(path)
+        return self.http.get(path, deadline=deadline)
         # try:
         #     response = self.http.get(path)
         #     self.logger.debug(f"Response {response.status_code}: {response.text}")
@@ -85,7 +134,9 @@ class ArgoCDClient:
         #         self.logger.error("Details:", e.details)
         #     return e
 
-    def update_application(self, app_body: dict, query_params: dict = None) -> Dict:
+    def update_application(
+        self, app_body: dict, query_params: dict = None, deadline: Deadline = None
+    ) -> dict:
         query_params = query_params or {}
         validate_query_params(query_params, "update_application")
 
@@ -101,14 +152,16 @@ class ArgoCDClient:
             path += f"?{query_string}"
 
         self.logger.info(f"Updating application '{app_name}'")
-        response = self.http.put(path, payload=json.dumps(app_body))
+        response = self.http.put(path, payload=json.dumps(app_body), deadline=deadline)
         if response.status_code != 200:
             raise Exception(
                 f"Failed to update application: {response.status_code}, {response.text}"
             )
         return response.json()
 
-    def patch_application(self, patch: dict, query_params: dict = None):
+    def patch_application(
+        self, patch: dict, query_params: dict = None, deadline: Deadline = None
+    ):
         query_params = query_params or {}
         validate_query_params(query_params, "update_application")
 
@@ -117,8 +170,9 @@ class ArgoCDClient:
         if not app_name:
             raise ValueError("metadata.name is required in the patch.")
 
-        current_app = self.get_application(app_name)
-        if not current_app:
+        response = self.get_application(app_name, deadline=deadline)
+        current_app = response.get("data") if response else None
+        if not isinstance(current_app, dict) or not current_app:
             raise Exception(f"Application '{app_name}' does not exist.")
 
         updated_app = copy.deepcopy(current_app)
@@ -131,7 +185,7 @@ class ArgoCDClient:
 
         self.logger.info(f"Partially updating application '{app_name}'")
 
-        response = self.http.put(path, json.dumps(updated_app))
+        response = self.http.put(path, json.dumps(updated_app), deadline=deadline)
         self.logger.debug(f"Response {response.status_code}: {response.text}")
         if response.status_code != 200:
             raise Exception(
@@ -139,7 +193,9 @@ class ArgoCDClient:
             )
         return response.json()
 
-    def patch_application_resource(self, name: str, patch: str, query_params: dict):
+    def patch_application_resource(
+        self, name: str, patch: str, query_params: dict, deadline: Deadline = None
+    ):
         if not patch or not isinstance(patch, str):
             raise ValueError("patch must be a raw JSON or YAML string.")
 
@@ -153,7 +209,10 @@ class ArgoCDClient:
             f"Patching resource for app '{name}' with query: {query_string}"
         )
         response = self.http.post(
-            path, payload=json.dumps(patch), content_type="application/json"
+            path,
+            payload=json.dumps(patch),
+            content_type="application/json",
+            deadline=deadline,
         )
 
         if response.status_code != 200:
@@ -166,40 +225,274 @@ class ArgoCDClient:
 
         return response.json()
 
-    def create_or_update_appset(self, appset_name, appset_spec):
+    def list_appsets(self, query_params: dict = None, deadline: Deadline = None):
+        query_params = query_params or {}
+        validate_query_params(query_params, "list_appsets")
+        query_string = urlencode(build_query_items(query_params))
+        path = appsets()
+        if query_string:
+            path += f"?{query_string}"
+
+        response = self.http.get(path, deadline=deadline)
+        items = (response.get("data") or {}).get("items") or []
+        for item in items:
+            name = item.get("metadata", {}).get("name")
+            if name:
+                self._appset_cache.set(name, copy.deepcopy(item))
+        return response
+
+    def get_appset(self, name, query_params: dict = None, deadline: Deadline = None):
+        query_params = query_params or {}
+        validate_query_params(query_params, "get_appset")
+        query_string = urlencode(build_query_items(query_params))
+        path = appset_path(name)
+        if query_string:
+            path += f"?{query_string}"
+
+        response = self.http.get(path, deadline=deadline)
+        self._appset_cache.set(name, copy.deepcopy(response.get("data")))
+        return response
+
+    def delete_appset(self, name, query_params: dict = None, deadline: Deadline = None):
+        query_params = query_params or {}
+        validate_query_params(query_params, "delete_appset")
+        query_string = urlencode(build_query_items(query_params))
+        path = appset_path(name)
+        if query_string:
+            path += f"?{query_string}"
+
+        self.logger.info(f"Deleting ApplicationSet '{name}'")
+        self._appset_cache.invalidate(name)
+        self._appset_applied.pop(name, None)
+        return self.http.delete(path, deadline=deadline)
+
+    def create_or_update_appset(
+        self, appset_name, appset_spec, force=False, deadline: Deadline = None
+    ):
+        """
+        Create or update an ApplicationSet. Unless force is set, the POST is
+        skipped when the stored spec equals appset_spec, or when appset_spec
+        is what this client last wrote and the stored spec has not changed
+        since. The stored object is taken from the cache when possible, and
+        read with a GET otherwise; use apply_appsets to upsert many
+        ApplicationSets with a single read.
+        """
+        if not force:
+            current = self._current_appset(appset_name, deadline)
+            if current is not None and self._appset_unchanged(
+                appset_name, appset_spec, current.get("spec")
+            ):
+                self.logger.debug(f"ApplicationSet '{appset_name}' is unchanged")
+                return copy.deepcopy(current)
+
         payload = {"metadata": {"name": appset_name}, "spec": appset_spec}
-        response = self.http.post(path=appsets(), payload=json.dumps(payload))
+        path = appsets() + "?" + urlencode({"upsert": "true"})
+        response = self.http.post(
+            path=path, payload=json.dumps(payload), deadline=deadline
+        )
         self.logger.debug(f"Response {response.status_code}: {response.text}")
         if response.status_code not in [200, 201]:
+            self._appset_cache.invalidate(appset_name)
             raise Exception(
                 f"Failed to create/update ApplicationSet: {response.status_code}, {response.text}"
             )
-        return response.json()
+        result = response.json()
+        self._remember_applied(appset_name, appset_spec, result.get("spec"))
+        self._appset_cache.set(appset_name, copy.deepcopy(result))
+        return result
+
+    def apply_appsets(self, appset_specs: dict, force=False, deadline: Deadline = None):
+        """
+        Upsert every ApplicationSet in appset_specs (name -> spec) for one
+        reconcile pass. A single list_appsets call refreshes the cache first,
+        so unchanged ApplicationSets cost no request of their own as long as
+        the pass finishes within cache_ttl, whatever the pass interval.
+        """
+        response = self.list_appsets(deadline=deadline)
+        items = (response.get("data") or {}).get("items") or []
+        existing = {item.get("metadata", {}).get("name") for item in items}
+        results = {}
+        for name, spec in appset_specs.items():
+            # Missing ApplicationSets are created without looking them up.
+            results[name] = self.create_or_update_appset(
+                name, spec, force=force or name not in existing, deadline=deadline
+            )
+        return results
+
+    def _remember_applied(self, name, desired_spec, stored_spec):
+        # Bounded like the cache; the oldest write is forgotten first, which
+        # only costs one extra POST if that ApplicationSet is applied again.
+        self._appset_applied.pop(name, None)
+        while len(self._appset_applied) >= self._appset_cache.max_entries:
+            self._appset_applied.pop(next(iter(self._appset_applied)), None)
+        self._appset_applied[name] = (
+            copy.deepcopy(desired_spec),
+            copy.deepcopy(stored_spec),
+        )
+
+    def _appset_unchanged(self, name, desired_spec, stored_spec):
+        if desired_spec == stored_spec:
+            return True
+        # The server may add defaults to what we wrote, so also compare
+        # against the result of this client's last write.
+        return self._appset_applied.get(name) == (desired_spec, stored_spec)
+
+    def _current_appset(self, name, deadline=None):
+        from .middleware import ArgoCDResponseError
+
+        current = self._appset_cache.get(name)
+        if current is not MISSING:
+            return current
+        try:
+            return self.get_appset(name, deadline=deadline).get("data")
+        except ArgoCDResponseError as e:
+            # Missing or unreadable: fall back to a plain upsert.
+            self.logger.debug(f"Could not read ApplicationSet '{name}': {e.message}")
+            return None
+
+    def list_projects(self, query_params: dict = None, deadline: Deadline = None):
+        query_params = query_params or {}
+        validate_query_params(query_params, "list_projects")
+        query_string = urlencode(build_query_items(query_params))
+        path = projects()
+        if query_string:
+            path += f"?{query_string}"
 
-    def get_application_status(self, app_name):
-        app = self.get_application(app_name)
+        response = self.http.get(path, deadline=deadline)
+        items = (response.get("data") or {}).get("items") or []
+        for item in items:
+            name = item.get("metadata", {}).get("name")
+            if name:
+                self._project_cache.set(
+                    name,
+                    {
+                        "success": True,
+                        "status_code": response["status_code"],
+                        "data": copy.deepcopy(item),
+                    },
+                )
+        return response
+
+    def get_project(self, name, use_cache=True, deadline: Deadline = None):
+        if use_cache:
+            cached = self._project_cache.get(name)
+            if cached is not MISSING:
+                return copy.deepcopy(cached)
+
+        response = self.http.get(project_path(name), deadline=deadline)
+        self._project_cache.set(name, copy.deepcopy(response))
+        return response
+
+    def delete_project(self, name, deadline: Deadline = None):
+        self.logger.info(f"Deleting project '{name}'")
+        self._project_cache.invalidate(name)
+        return self.http.delete(project_path(name), deadline=deadline)
+
+    def get_application_status(self, app_name, deadline: Deadline = None):
+        app = self.get_application(app_name, deadline=deadline)
         return app.get("data", {}).get("status", {}) if app else {}
 
-    def wait_for_sync(self, app_name, timeout=120, interval=5):
+    def get_application_resource_tree(
+        self, name, query_params: dict = None, deadline: Deadline = None
+    ):
+        query_params = query_params or {}
+        validate_query_params(query_params, "resource_tree")
+        query_string = urlencode(build_query_items(query_params))
+        path = app_resource_tree(name)
+        if query_string:
+            path += f"?{query_string}"
+
+        return self.http.get(path, deadline=deadline)
+
+    def get_health_rollup(self, app_name, from_tree=False, deadline: Deadline = None):
         """
-        Wait until it is synced or failed, with a timeout.
+        Refresh and return the cached health rollup for one application,
+        either from its status or from its resource tree.
         """
-        start = time.time()
-        while time.time() - start < timeout:
-            status = self.get_application_status(app_name)
-            sync_status = status.get("sync", {}).get("status")
-            health_status = status.get("health", {}).get("status")
-
-            if sync_status == "Synced" and health_status == "Healthy":
-                return True
-            if sync_status == "Unknown" or health_status == "Degraded":
-                return False
+        if from_tree:
+            tree = self.get_application_resource_tree(app_name, deadline=deadline)
+            rollup = self.health_rollups.update_from_tree(app_name, tree.get("data"))
+        else:
+            status = self.get_application_status(app_name, deadline=deadline)
+            rollup = self.health_rollups.update_from_status(app_name, status)
+        return rollup.summary()
+
+    def get_fleet_health_rollup(
+        self,
+        app_names: list = None,
+        query_params: dict = None,
+        concurrency: int = 16,
+        deadline: Deadline = None,
+    ):
+        """
+        Refresh rollups for many applications and return the fleet summary.
 
-            time.sleep(interval)
+        Without app_names, a single list_applications call (filtered by
+        query_params) supplies every app's status. With app_names, the apps
+        are fetched concurrently; apps that fail are dropped from the fleet
+        summary and reported under "errors". Either way the fleet is exactly
+        the apps of this call; rollups for other apps are dropped.
+        """
+        errors = {}
+        if app_names is None:
+            response = self.list_applications(query_params, deadline=deadline)
+            items = (response.get("data") or {}).get("items") or []
+            names = []
+            for item in items:
+                name = item.get("metadata", {}).get("name")
+                if not name:
+                    continue
+                names.append(name)
+                self.health_rollups.update_from_status(name, item.get("status"))
+            self.health_rollups.retain(names)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            def refresh(name):
+                try:
+                    status = self.get_application_status(name, deadline=deadline)
+                    self.health_rollups.update_from_status(name, status)
+                except Exception as e:
+                    # Drop the app so stale counts do not linger in the fleet.
+                    self.health_rollups.forget(name)
+                    errors[name] = str(e)
+
+            self.health_rollups.retain(app_names)
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                list(pool.map(refresh, app_names))
+
+        summary = self.health_rollups.fleet_summary()
+        summary["errors"] = errors
+        return summary
+
+    def wait_for_sync(
+        self, app_name, timeout=120, interval=5, deadline: Deadline = None
+    ):
+        """
+        Wait until it is synced or failed, with a timeout.
+        If a deadline is given it bounds the whole wait instead of timeout.
+        """
+        deadline = deadline or Deadline(timeout)
+        try:
+            while not deadline.expired:
+                status = self.get_application_status(app_name, deadline=deadline)
+                sync_status = status.get("sync", {}).get("status")
+                health_status = status.get("health", {}).get("status")
+
+                if sync_status == "Synced" and health_status == "Healthy":
+                    return True
+                if sync_status == "Unknown" or health_status == "Degraded":
+                    return False
+
+                deadline.sleep(interval)
+        except DeadlineExceeded:
+            pass
 
         return False  # Timeout
 
-    def sync_application_advanced(self, name: str, sync_body: dict):
+    def sync_application_advanced(
+        self, name: str, sync_body: dict, deadline: Deadline = None
+    ):
         """
         Perform a full-featured sync on the application with a structured request body.
         See ArgoCD API docs for all fields. Example:
@@ -219,7 +512,9 @@ class ArgoCDClient:
 
         path = app_sync(name)
         self.logger.info(f"Syncing application '{name}' with full payload")
-        response = self.http.post(path, payload=json.dumps(sync_body))
+        response = self.http.post(
+            path, payload=json.dumps(sync_body), deadline=deadline
+        )
 
         if response.status_code != 200:
             raise Exception(
@@ -237,6 +532,7 @@ class ArgoCDClient:
         sync_options: list = None,
         wait: bool = True,
         timeout: int = 120,
+        deadline: Deadline = None,
     ):
         sync_body = {
             "dryRun": dry_run,
@@ -254,10 +550,10 @@ class ArgoCDClient:
         self.logger.info(
             f"Starting simplified sync for app '{name}' with body: {json.dumps(sync_body)}"
         )
-        result = self.sync_application_advanced(name, sync_body)
+        result = self.sync_application_advanced(name, sync_body, deadline=deadline)
 
         if wait:
-            success = self.wait_for_sync(name, timeout)
+            success = self.wait_for_sync(name, timeout, deadline=deadline)
             if not success:
                 raise Exception(
                     f"Application '{name}' did not reach Synced/Healthy state."
@@ -274,7 +570,7 @@ class ArgoCDClient:
             "result": result,
         }
 
-    def sync_application(self, name: str, sync_body: dict):
+    def sync_application(self, name: str, sync_body: dict, deadline: Deadline = None):
         if not isinstance(sync_body, dict):
             raise ValueError("sync_body must be a dictionary.")
 
@@ -286,7 +582,9 @@ class ArgoCDClient:
         self.logger.debug(
             f"Triggering sync for \napplication: '{name}' \npayload: {sync_body}"
         )
-        response = self.http.post(app_sync(name), payload=json.dumps(sync_body))
+        response = self.http.post(
+            app_sync(name), payload=json.dumps(sync_body), deadline=deadline
+        )
         if response.status_code != 200:
             raise Exception(
                 f"Failed to sync application: {response.status_code}, {response.text}"
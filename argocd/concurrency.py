@@ -0,0 +1,135 @@
+import threading
+import time
+
+# Status codes that mean the API server is saturated rather than the request
+# being wrong.
+OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Latency samples a route needs before it can shrink the limit.
+MIN_ROUTE_SAMPLES = 5
+
+# Shortest gap between two cuts, used until (and whenever) the smoothed round
+# trip is shorter than this.
+MIN_DECREASE_INTERVAL = 0.1
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight requests, steered by latency and overload responses.
+
+    The limit grows by about one per window of successful requests while
+    latency stays close to its long-term baseline. It is cut multiplicatively
+    on 429/5xx responses, timeouts and connection errors, or when short-term
+    latency rises well above the baseline. Cuts happen at most once per
+    smoothed round trip (at least MIN_DECREASE_INTERVAL), so a burst of
+    failures from the same window shrinks the limit once. The round trip is
+    smoothed over every request with a measured latency, overloaded ones
+    included.
+
+    Latency baselines are kept per route, so a route that is always slow
+    (e.g. listing every application) does not look like a spike next to
+    cheap GETs.
+    """
+
+    def __init__(
+        self,
+        initial_limit=64,
+        min_limit=1,
+        max_limit=256,
+        backoff=0.7,
+        latency_tolerance=2.0,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        # route -> [short EWMA, long EWMA, samples]
+        self._latency = {}
+        self._last_decrease = 0.0
+        # Smoothed round trip over all routes; None until the first sample.
+        self._rtt = None
+        self._requests = 0
+        self._overloads = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def acquire(self, deadline=None):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                # Wake up regularly so a cancelled deadline is noticed.
+                deadline.check()
+                remaining = deadline.remaining()
+                self._cond.wait(0.1 if remaining is None else min(0.1, remaining))
+            self._in_flight += 1
+
+    def release(self, latency=None, overloaded=False, route=None):
+        """
+        Return a slot. latency is None when the request failed for a reason
+        that says nothing about server load.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if latency is not None:
+                if self._rtt is None:
+                    self._rtt = latency
+                else:
+                    self._rtt += 0.2 * (latency - self._rtt)
+            if overloaded:
+                self._overloads += 1
+                self._decrease()
+            elif latency is not None:
+                self._requests += 1
+                self._observe(route, latency)
+            self._cond.notify_all()
+
+    def _observe(self, route, latency):
+        stats = self._latency.get(route)
+        if stats is None:
+            stats = self._latency[route] = [latency, latency, 0]
+        else:
+            stats[0] += 0.2 * (latency - stats[0])
+            stats[1] += 0.02 * (latency - stats[1])
+        stats[2] += 1
+
+        short, long, samples = stats
+        if samples >= MIN_ROUTE_SAMPLES and short > long * self.latency_tolerance:
+            self._decrease()
+        elif self._in_flight + 1 >= int(self._limit):
+            # Only grow while the current window is actually being used.
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < max(self._rtt or 0.0, MIN_DECREASE_INTERVAL):
+            return
+        self._last_decrease = now
+        self._limit = max(self.min_limit, self._limit * self.backoff)
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests": self._requests,
+                "overloads": self._overloads,
+                "rtt": self._rtt,
+                "latency": {
+                    route: {"short": short, "long": long, "samples": samples}
+                    for route, (short, long, samples) in self._latency.items()
+                },
+            }
@@ -2,4 +2,17 @@ import os
 
 API_REQUEST_TIMEOUT = 30
 DEFAULT_API_VERSION = "v1"
-API_VERSION = os.getenv("ARGOCD_API_VERSION", DEFAULT_API_VERSION)
+# Seconds that ApplicationSet and Project reads are cached for. Periodic
+# ApplicationSet reconcilers should use ArgoCDClient.apply_appsets, which
+# refreshes the cache once per pass, rather than rely on this outliving the
+# pass interval.
+CACHE_TTL = 60
+
+
+def __getattr__(name):
+    # Environment-backed settings are read on first access, not at import.
+    if name == "API_VERSION":
+        value = os.getenv("ARGOCD_API_VERSION", DEFAULT_API_VERSION)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,103 @@
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+class Deadline:
+    """
+    Overall time budget for an operation that spans several requests and
+    sleeps. Every request made with a deadline uses the smaller of its own
+    timeout and the time left, and the deadline can be cancelled from another
+    thread.
+
+        deadline = Deadline(60)
+        client.sync_application_simplified("guestbook", deadline=deadline)
+
+        # elsewhere
+        deadline.cancel()
+    """
+
+    def __init__(self, timeout=None):
+        self._expires_at = None if timeout is None else time.monotonic() + timeout
+        self._cancelled = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def on_cancel(self, callback):
+        """
+        Register a callback to run on cancel. Returns a function that
+        unregisters it again.
+        """
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self):
+        if self.cancelled:
+            raise OperationCancelled("Operation was cancelled.")
+        if self.expired:
+            raise DeadlineExceeded("Deadline exceeded.")
+
+    def timeout(self, default=None):
+        """
+        Timeout to use for the next request: the time left, capped at default.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        if default is None:
+            return remaining
+        return min(default, remaining)
+
+    def sleep(self, seconds):
+        """
+        Sleep for seconds, but no longer than the time left. Wakes up and
+        raises OperationCancelled as soon as the deadline is cancelled.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, remaining)
+        if self._cancelled.wait(seconds):
+            raise OperationCancelled("Operation was cancelled.")
@@ -0,0 +1,180 @@
+"""
+Compact sync/health rollups over an application's resources.
+
+A rollup counts resources by sync and health state, overall and per kind and
+per namespace. Rollups are updated incrementally: each new snapshot is diffed
+against the previous one and only changed resources touch the counters, so a
+fleet-wide rollup can be kept current without re-aggregating every app.
+"""
+
+import threading
+from collections import Counter
+
+UNKNOWN = "Unknown"
+
+
+def _resource_key(resource):
+    return (
+        resource.get("group") or "",
+        resource.get("kind") or "",
+        resource.get("namespace") or "",
+        resource.get("name") or "",
+    )
+
+
+def _state(resource, sync=None):
+    health = (resource.get("health") or {}).get("status") or UNKNOWN
+    return (
+        resource.get("kind") or UNKNOWN,
+        resource.get("namespace") or "",
+        resource.get("status") or sync or UNKNOWN,
+        health,
+    )
+
+
+def _counts(state):
+    kind, namespace, sync, health = state
+    return (
+        ("all", "", "sync", sync),
+        ("all", "", "health", health),
+        ("kind", kind, "sync", sync),
+        ("kind", kind, "health", health),
+        ("namespace", namespace, "sync", sync),
+        ("namespace", namespace, "health", health),
+    )
+
+
+def summarize(counter):
+    """
+    Turn rollup counters into a nested dict:
+    {"sync": {...}, "health": {...}, "by_kind": {...}, "by_namespace": {...}}
+    """
+    result = {"sync": {}, "health": {}, "by_kind": {}, "by_namespace": {}}
+    for (dimension, key, field, value), count in counter.items():
+        if count <= 0:
+            continue
+        if dimension == "all":
+            target = result
+        else:
+            group = result["by_kind" if dimension == "kind" else "by_namespace"]
+            target = group.setdefault(key, {"sync": {}, "health": {}})
+        target[field][value] = count
+    result["total"] = sum(result["sync"].values())
+    return result
+
+
+class HealthRollup:
+    """
+    Rollup for one application, fed from successive status.resources lists
+    or resource-tree snapshots.
+    """
+
+    def __init__(self):
+        self._states = {}
+        self.counter = Counter()
+
+    def update(self, resources, keep_sync=False):
+        """
+        Replace the app's resources with a new snapshot. Returns the change in
+        counters, which callers can apply to an aggregate.
+
+        keep_sync reuses the last known sync state for resources that carry no
+        sync status of their own (resource-tree nodes).
+        """
+        delta = Counter()
+        seen = set()
+        for resource in resources:
+            key = _resource_key(resource)
+            seen.add(key)
+            old = self._states.get(key)
+            new = _state(resource, old[2] if keep_sync and old else None)
+            if new == old:
+                continue
+            if old is not None:
+                for count_key in _counts(old):
+                    delta[count_key] -= 1
+            for count_key in _counts(new):
+                delta[count_key] += 1
+            self._states[key] = new
+
+        for key in [k for k in self._states if k not in seen]:
+            for count_key in _counts(self._states.pop(key)):
+                delta[count_key] -= 1
+
+        self.counter.update(delta)
+        return delta
+
+    def update_from_status(self, status):
+        return self.update((status or {}).get("resources") or [])
+
+    def update_from_tree(self, tree, include_children=False):
+        """
+        Update from a resource tree. By default only top-level nodes are used,
+        which matches the set of resources in status.resources.
+        """
+        nodes = (tree or {}).get("nodes") or []
+        if not include_children:
+            nodes = (node for node in nodes if not node.get("parentRefs"))
+        return self.update(nodes, keep_sync=True)
+
+    def unhealthy(self):
+        """
+        Yield (group, kind, namespace, name, sync, health) for resources that
+        are not Healthy or not Synced.
+        """
+        for key, (_, _, sync, health) in self._states.items():
+            if health not in ("Healthy", UNKNOWN) or sync not in ("Synced", UNKNOWN):
+                yield key + (sync, health)
+
+    def summary(self):
+        return summarize(self.counter)
+
+
+class RollupCache:
+    """
+    Per-app rollups plus a fleet-wide aggregate kept in step with them.
+    """
+
+    def __init__(self):
+        self._apps = {}
+        self._fleet = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, app_name):
+        with self._lock:
+            return self._apps.setdefault(app_name, HealthRollup())
+
+    def update_from_status(self, app_name, status):
+        return self._apply(app_name, lambda r: r.update_from_status(status))
+
+    def update_from_tree(self, app_name, tree, include_children=False):
+        return self._apply(
+            app_name, lambda r: r.update_from_tree(tree, include_children)
+        )
+
+    def _apply(self, app_name, update):
+        rollup = self.get(app_name)
+        with self._lock:
+            self._fleet.update(update(rollup))
+        return rollup
+
+    def forget(self, app_name):
+        with self._lock:
+            rollup = self._apps.pop(app_name, None)
+            if rollup is not None:
+                self._fleet.subtract(rollup.counter)
+
+    def retain(self, app_names):
+        """
+        Drop rollups for apps that are not in app_names.
+        """
+        app_names = set(app_names)
+        with self._lock:
+            for app_name in [name for name in self._apps if name not in app_names]:
+                self._fleet.subtract(self._apps.pop(app_name).counter)
+
+    def fleet_summary(self):
+        with self._lock:
+            summary = summarize(self._fleet)
+            summary["apps"] = len(self._apps)
+        return summary
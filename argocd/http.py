@@ -1,10 +1,31 @@
-import requests
-from .middleware import handle_response
+import time
+
+from .concurrency import OVERLOAD_STATUS_CODES, AdaptiveLimiter
+from .deadline import DeadlineExceeded, OperationCancelled
+from .transfer import (
+    DEFAULT_ACCEPT_ENCODING,
+    TransferStats,
+    gzip_body,
+    response_sizes,
+    route_key,
+)
 
 
 class HttpClient:
     def __init__(
-        self, base_url, headers, timeout, verify_ssl=True, logger=None, proxies=None
+        self,
+        base_url,
+        headers,
+        timeout,
+        verify_ssl=True,
+        logger=None,
+        proxies=None,
+        accept_encoding=DEFAULT_ACCEPT_ENCODING,
+        compress_min_bytes=None,
+        adaptive_concurrency=True,
+        limiter=None,
+        recorder=None,
+        transport=None,
     ):
         self.base_url = base_url.rstrip("/")
         self.headers = headers
@@ -12,64 +33,259 @@ class HttpClient:
         self.logger = logger
         self.timeout = timeout
         self.proxies = proxies or {}
+        # Response encodings to negotiate; None asks for uncompressed bodies.
+        self.accept_encoding = accept_encoding
+        # Gzip request bodies of at least this many bytes; None disables it.
+        self.compress_min_bytes = compress_min_bytes
+        self.transfer_stats = TransferStats()
+        # Adaptive cap on in-flight requests, shared by every thread using
+        # this client.
+        if limiter is None and adaptive_concurrency:
+            limiter = AdaptiveLimiter()
+        self.limiter = limiter
+        # Optional recording.Recorder, and a transport (e.g.
+        # recording.ReplayTransport) that replaces the network.
+        self.recorder = recorder
+        self.transport = transport
+
+    def get(self, path, deadline=None):
+        from .middleware import handle_response
 
-    def get(self, path):
         url = f"{self.base_url}{path}"
-        resp = requests.get(
-            url,
-            headers=self.headers,
-            verify=self.verify_ssl,
-            timeout=self.timeout,
-            proxies=self.proxies,
-        )
+        resp = self._send("GET", url, deadline, headers=self.headers)
         self._log_response(resp)
         return handle_response(resp)
 
-    def post(self, path, payload, content_type="application/json"):
+    def post(self, path, payload, content_type="application/json", deadline=None):
         url = f"{self.base_url}{path}"
         self.logger.debug(f"POST {url} with body: {payload}")
         headers = self.headers.copy()
         headers["Content-Type"] = content_type
-        resp = requests.post(
-            url,
-            headers=headers,
-            data=payload,
-            verify=self.verify_ssl,
-            timeout=self.timeout,
-            proxies=self.proxies,
-        )
+        resp = self._send("POST", url, deadline, headers=headers, data=payload)
         self._log_response(resp)
         return resp
 
-    def put(self, path, payload):
+    def put(self, path, payload, deadline=None):
         url = f"{self.base_url}{path}"
         self.logger.debug(f"PUT {url} with body: {payload}")
-        resp = requests.put(
-            url,
-            headers=self.headers,
-            data=payload,
-            verify=self.verify_ssl,
-            timeout=self.timeout,
-            proxies=self.proxies,
-        )
+        resp = self._send("PUT", url, deadline, headers=self.headers, data=payload)
         self._log_response(resp)
         return resp
 
-    def patch(self, path, raw_body, content_type="application/json"):
+    def patch(self, path, raw_body, content_type="application/json", deadline=None):
         url = f"{self.base_url}{path}"
         headers = self.headers.copy()
         headers["Content-Type"] = content_type
         self.logger.debug(f"PATCH {url} with raw body:\n{raw_body}")
-        resp = requests.patch(
-            url,
-            headers=headers,
-            data=raw_body,
-            verify=self.verify_ssl,
-            timeout=self.timeout,
-            proxies=self.proxies,
-        )
+        resp = self._send("PATCH", url, deadline, headers=headers, data=raw_body)
         self._log_response(resp)
         return resp
 
+    def delete(self, path, deadline=None):
+        from .middleware import handle_response
+
+        url = f"{self.base_url}{path}"
+        resp = self._send("DELETE", url, deadline, headers=self.headers)
+        self._log_response(resp)
+        return handle_response(resp)
+
+    def _send(self, method, url, deadline=None, headers=None, data=None):
+        headers = dict(headers or {})
+        headers["Accept-Encoding"] = self.accept_encoding or "identity"
+        body = data
+
+        request_bytes = request_wire_bytes = 0
+        if data is not None:
+            data, request_bytes, compressed = gzip_body(data, self.compress_min_bytes)
+            request_wire_bytes = len(data)
+            if compressed:
+                headers["Content-Encoding"] = "gzip"
+
+        resp, started, duration = self._limited(
+            method, url, deadline, headers=headers, data=data
+        )
+        if self.recorder is not None:
+            self.recorder.record(method, url, headers, body, resp, started, duration)
+        self.transfer_stats.record(
+            route_key(method, url),
+            request_bytes,
+            request_wire_bytes,
+            response_sizes(resp),
+        )
+        return resp
+
+    def _limited(self, method, url, deadline=None, **kwargs):
+        """
+        Send through the limiter. Returns (resp, started, duration), where the
+        timing covers only the transport call, not time queued on the limiter.
+        """
+        # Imported before timing starts so the first request is not charged
+        # for loading requests.
+        import requests
+
+        if self.limiter is not None:
+            self.limiter.acquire(deadline)
+        started = time.monotonic()
+        try:
+            resp = self._transport(method, url, deadline, **kwargs)
+        except Exception as e:
+            if self.limiter is not None:
+                # A timeout caused by the caller's own deadline running out
+                # says nothing about server load.
+                overloaded = isinstance(
+                    e, (requests.Timeout, requests.ConnectionError)
+                ) and not (deadline is not None and deadline.expired)
+                self.limiter.release(
+                    latency=time.monotonic() - started if overloaded else None,
+                    overloaded=overloaded,
+                    route=route_key(method, url),
+                )
+            raise
+        duration = time.monotonic() - started
+        if self.limiter is not None:
+            self.limiter.release(
+                latency=duration,
+                overloaded=resp.status_code in OVERLOAD_STATUS_CODES,
+                route=route_key(method, url),
+            )
+        return resp, started, duration
+
+    def _transport(self, method, url, deadline=None, **kwargs):
+        import requests
+
+        if deadline is None:
+            if self.transport is not None:
+                return self.transport.send(method, url, **kwargs)
+            return requests.request(
+                method,
+                url,
+                verify=self.verify_ssl,
+                timeout=self.timeout,
+                proxies=self.proxies,
+                **kwargs,
+            )
+
+        try:
+            resp = self._send_with_deadline(method, url, deadline, **kwargs)
+        except requests.Timeout as e:
+            # The request timeout was capped at the time left, so running out
+            # of it means the deadline passed.
+            if deadline.expired:
+                raise DeadlineExceeded(f"{method} {url} ran past the deadline.") from e
+            raise
+        if deadline.cancelled:
+            raise OperationCancelled(f"{method} {url} was cancelled.")
+        return resp
+
+    def _send_with_deadline(self, method, url, deadline, **kwargs):
+        if self.transport is not None:
+            return self.transport.send(method, url, deadline=deadline, **kwargs)
+
+        import requests
+
+        # Each request only gets the time left on the deadline. Its connection
+        # is tracked so a cancel from another thread can shut the socket down
+        # and interrupt a request that is already in flight.
+        timeout = deadline.timeout(self.timeout)
+        adapter = _cancellable_adapter_class()()
+        with requests.Session() as session:
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            unregister = deadline.on_cancel(adapter.abort)
+            try:
+                return session.request(
+                    method,
+                    url,
+                    verify=self.verify_ssl,
+                    timeout=timeout,
+                    proxies=self.proxies,
+                    **kwargs,
+                )
+            except Exception as e:
+                if deadline.cancelled:
+                    raise OperationCancelled(f"{method} {url} was cancelled.") from e
+                raise
+            finally:
+                unregister()
+
     def _log_response(self, resp):
         self.logger.debug(f"Response {resp.status_code}: {resp.text}")
+
+
+_CANCELLABLE_ADAPTER = None
+
+
+def _cancellable_adapter_class():
+    """
+    HTTPAdapter that remembers the connections it checks out, so abort() can
+    shut their sockets down from another thread. Built on first use to keep
+    requests out of the import path.
+
+    requests has no public hook for the connection a request is sent on, so
+    this relies on internals of requests and urllib3 (tested with requests
+    2.34 and urllib3 2.8):
+      - HTTPAdapter.get_connection_with_tls_context (requests >= 2.32.2) or
+        the older, deprecated get_connection returns the urllib3
+        HTTPConnectionPool used for the request;
+      - HTTPConnectionPool._get_conn() is the private method urlopen() calls
+        to check a connection out, which is wrapped per pool to record it;
+      - HTTPConnection.sock is the connected socket that abort() shuts down.
+    If these change, abort() stops interrupting requests in flight and
+    cancellation falls back to the request timeout.
+    """
+    global _CANCELLABLE_ADAPTER
+    if _CANCELLABLE_ADAPTER is not None:
+        return _CANCELLABLE_ADAPTER
+
+    import socket
+    import threading
+
+    from requests.adapters import HTTPAdapter
+
+    class CancellableAdapter(HTTPAdapter):
+        def __init__(self, *args, **kwargs):
+            self._connections = []
+            self._aborted = False
+            self._conn_lock = threading.Lock()
+            super().__init__(*args, **kwargs)
+
+        def get_connection_with_tls_context(self, *args, **kwargs):
+            return self._track(super().get_connection_with_tls_context(*args, **kwargs))
+
+        def get_connection(self, *args, **kwargs):
+            return self._track(super().get_connection(*args, **kwargs))
+
+        def _track(self, pool):
+            if getattr(pool, "_cancel_tracked", False):
+                return pool
+            get_conn = pool._get_conn
+
+            def tracked_get_conn(*args, **kwargs):
+                conn = get_conn(*args, **kwargs)
+                with self._conn_lock:
+                    self._connections.append(conn)
+                    aborted = self._aborted
+                if aborted:
+                    conn.close()
+                return conn
+
+            pool._get_conn = tracked_get_conn
+            pool._cancel_tracked = True
+            return pool
+
+        def abort(self):
+            with self._conn_lock:
+                self._aborted = True
+                connections = list(self._connections)
+            for conn in connections:
+                sock = getattr(conn, "sock", None)
+                if sock is not None:
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                conn.close()
+            self.close()
+
+    _CANCELLABLE_ADAPTER = CancellableAdapter
+    return _CANCELLABLE_ADAPTER
@@ -1,8 +1,7 @@
-import logging
-import sys
-
-
 def get_logger(name="argocd_client", debug=False, log_format="text"):
+    import logging
+    import sys
+
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG if debug else logging.INFO)
 
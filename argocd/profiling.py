@@ -0,0 +1,117 @@
+import cProfile
+import functools
+import pstats
+import threading
+import time
+
+_SKIP_METHODS = {"wait_for_sync"}
+
+
+class ClientProfiler:
+    """
+    Profiles the public methods of an ArgoCDClient instance with cProfile.
+
+        with ClientProfiler(client) as profiler:
+            run_workload(client)
+        profiler.stats().sort_stats("cumulative").print_stats(20)
+        print(profiler.timings())
+
+    Each thread gets its own profile, merged by stats(). Only the outermost
+    client call in a thread is profiled, so methods that call other methods
+    (patch_application -> get_application) are not profiled twice.
+    Methods in skip are only timed; by default this is wait_for_sync, whose
+    sleeps would drown out everything else.
+    """
+
+    def __init__(self, client, skip=_SKIP_METHODS):
+        self.client = client
+        self.skip = set(skip)
+        self._profiles = []
+        self._timings = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._wrapped = []
+
+    def start(self):
+        for name in dir(type(self.client)):
+            if name.startswith("_"):
+                continue
+            method = getattr(self.client, name)
+            if callable(method):
+                setattr(self.client, name, self._wrap(name, method))
+                self._wrapped.append(name)
+        return self
+
+    def stop(self):
+        for name in self._wrapped:
+            # Drop the instance attribute so the class method is used again.
+            delattr(self.client, name)
+        self._wrapped = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _profile(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def _wrap(self, name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            outermost = not getattr(self._local, "active", False)
+            start = time.perf_counter()
+            try:
+                if not outermost or name in self.skip:
+                    return method(*args, **kwargs)
+                profile = self._profile()
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Python 3.12+ allows one active profiler per process;
+                    # concurrent calls from other threads are only timed.
+                    return method(*args, **kwargs)
+                self._local.active = True
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    profile.disable()
+                    self._local.active = False
+            finally:
+                self._record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    def _record(self, name, elapsed):
+        with self._lock:
+            calls, total = self._timings.get(name, (0, 0.0))
+            self._timings[name] = (calls + 1, total + elapsed)
+
+    def timings(self):
+        """
+        Per-method call counts and wall time, including nested calls.
+        """
+        with self._lock:
+            return {
+                name: {"calls": calls, "total": total, "mean": total / calls}
+                for name, (calls, total) in sorted(self._timings.items())
+            }
+
+    def stats(self):
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            raise ValueError("No client calls have been profiled yet.")
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def dump(self, path):
+        self.stats().dump_stats(path)
@@ -0,0 +1,228 @@
+"""
+Client-side filtering of listed applications.
+
+    query = AppQuery(
+        selector="env=prod,tier notin (db)",
+        where={"health": "Degraded", "namespace": ["payments", "billing"]},
+    )
+    for app in client.query_applications(query):
+        ...
+
+The label selector and project/repo/name equality filters are sent to the
+server; every other predicate is compiled once and applied to the returned
+items in a single pass.
+"""
+
+import re
+
+# Short names for the fields people filter on most.
+FIELD_ALIASES = {
+    "name": "metadata.name",
+    "namespace": "spec.destination.namespace",
+    "server": "spec.destination.server",
+    "cluster": "spec.destination.name",
+    "project": "spec.project",
+    "repo": "spec.source.repoURL",
+    "path": "spec.source.path",
+    "revision": "spec.source.targetRevision",
+    "sync": "status.sync.status",
+    "health": "status.health.status",
+    "operation": "status.operationState.phase",
+}
+
+# Fields the list endpoint can filter on, and the query parameter to use.
+_PUSHDOWN_FIELDS = {
+    "spec.project": "projects",
+    "spec.source.repoURL": "repo",
+    "metadata.name": "name",
+}
+
+_MISSING = object()
+
+_SELECTOR_SET = re.compile(r"^\s*([\w./-]+)\s+(in|notin)\s+\(([^)]*)\)\s*$")
+_SELECTOR_EQ = re.compile(r"^\s*([\w./-]+)\s*(==|=|!=)\s*([\w./-]*)\s*$")
+_SELECTOR_EXISTS = re.compile(r"^\s*(!?)([\w./-]+)\s*$")
+
+
+def _split_selector(selector):
+    # Commas inside "in (a,b)" do not separate requirements.
+    parts, depth, current = [], 0, []
+    for char in selector:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [part for part in parts if part.strip()]
+
+
+def compile_selector(selector):
+    """
+    Compile a Kubernetes label selector into a predicate over an application.
+    """
+    checks = []
+    for requirement in _split_selector(selector or ""):
+        match = _SELECTOR_SET.match(requirement)
+        if match:
+            key, op, values = match.groups()
+            values = frozenset(v.strip() for v in values.split(",") if v.strip())
+            if op == "in":
+                checks.append(lambda labels, k=key, v=values: labels.get(k) in v)
+            else:
+                checks.append(lambda labels, k=key, v=values: labels.get(k) not in v)
+            continue
+        match = _SELECTOR_EQ.match(requirement)
+        if match:
+            key, op, value = match.groups()
+            if op == "!=":
+                checks.append(lambda labels, k=key, v=value: labels.get(k) != v)
+            else:
+                checks.append(lambda labels, k=key, v=value: labels.get(k) == v)
+            continue
+        match = _SELECTOR_EXISTS.match(requirement)
+        if match:
+            negate, key = match.groups()
+            if negate:
+                checks.append(lambda labels, k=key: k not in labels)
+            else:
+                checks.append(lambda labels, k=key: k in labels)
+            continue
+        raise ValueError(f"Invalid label selector requirement: '{requirement}'")
+
+    def predicate(item):
+        labels = (item.get("metadata") or {}).get("labels") or {}
+        for check in checks:
+            if not check(labels):
+                return False
+        return True
+
+    return predicate
+
+
+def _getter(path):
+    keys = tuple(FIELD_ALIASES.get(path, path).split("."))
+
+    def get(item):
+        value = item
+        for key in keys:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+
+    return get
+
+
+def compile_field(path, expected):
+    """
+    Compile a field predicate. expected may be a value (equality), a list,
+    tuple or set (membership) or a callable taking the field value.
+    """
+    get = _getter(path)
+    if callable(expected):
+
+        def check(item):
+            value = get(item)
+            return expected(None if value is _MISSING else value)
+
+        return check
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        allowed = frozenset(expected)
+        return lambda item: get(item) in allowed
+    return lambda item: get(item) == expected
+
+
+class AppQuery:
+    def __init__(self, selector: str = None, where: dict = None):
+        self.selector = selector
+        self.where = dict(where or {})
+        self.server_params = {}
+        predicates = []
+        # Predicates for the filters sent to the server, used by matches().
+        pushed = []
+
+        if selector:
+            pushed.append(compile_selector(selector))
+            self.server_params["selector"] = selector
+
+        for path, expected in self.where.items():
+            full_path = FIELD_ALIASES.get(path, path)
+            param = _PUSHDOWN_FIELDS.get(full_path)
+            predicate = compile_field(full_path, expected)
+            if param == "projects" and isinstance(expected, (str, list, tuple, set)):
+                values = [expected] if isinstance(expected, str) else list(expected)
+                self.server_params[param] = values
+                pushed.append(predicate)
+            elif param in ("repo", "name") and isinstance(expected, str):
+                self.server_params[param] = expected
+                pushed.append(predicate)
+            else:
+                predicates.append(predicate)
+
+        self._predicates = tuple(predicates)
+        self._all_predicates = tuple(pushed) + self._predicates
+
+    def merge_server_params(self, params: dict = None) -> dict:
+        """
+        Combine server_params with a caller's list query parameters without
+        widening either: selectors are joined, projects are intersected and
+        any other shared key must have the same value.
+        """
+        merged = dict(params or {})
+        for key, value in self.server_params.items():
+            current = merged.get(key)
+            if current in (None, "", []):
+                merged[key] = value
+            elif key == "selector":
+                merged[key] = f"{current},{value}"
+            elif key == "projects":
+                current = [current] if isinstance(current, str) else list(current)
+                common = [project for project in current if project in value]
+                if not common:
+                    raise ValueError(
+                        f"query_params projects {current} and query projects "
+                        f"{value} have nothing in common."
+                    )
+                merged[key] = common
+            elif current != value:
+                raise ValueError(
+                    f"Conflicting '{key}' filter: {current!r} in query_params, "
+                    f"{value!r} in the query."
+                )
+        return merged
+
+    def matches(self, item: dict) -> bool:
+        """
+        Check a single item against every filter, including the ones that
+        are normally applied by the server.
+        """
+        for predicate in self._all_predicates:
+            if not predicate(item):
+                return False
+        return True
+
+    def filter(self, items):
+        """
+        Lazily yield the items that match the local predicates. Items are
+        expected to come from a list request made with server_params.
+        """
+        predicates = self._predicates
+        if not predicates:
+            yield from items
+            return
+        for item in items:
+            for predicate in predicates:
+                if not predicate(item):
+                    break
+            else:
+                yield item
+
+    def __repr__(self):
+        return f"AppQuery(selector={self.selector!r}, where={self.where!r})"
@@ -0,0 +1,156 @@
+"""
+Record HttpClient traffic to a file and serve it back offline.
+
+    recorder = Recorder("traffic.jsonl.gz")
+    client = ArgoCDClient(api_url, token, proxies, recorder=recorder)
+    ...
+    recorder.close()
+
+    replay = ReplayTransport("traffic.jsonl.gz", speed=2.0)
+    client = ArgoCDClient(api_url, "unused", None, transport=replay)
+
+Files are JSONL, gzipped when the name ends in .gz. Sensitive headers are
+redacted with middleware.redact_headers before anything is written.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlsplit
+
+from .middleware import redact_headers
+
+# Headers that describe the wire encoding, not the stored (decoded) body.
+_WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ReplayMiss(Exception):
+    pass
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        import gzip
+
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _relative(url):
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def _text(body):
+    if body is None or isinstance(body, str):
+        return body
+    return body.decode("utf-8", errors="replace")
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self._file = _open(path, "w")
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, method, url, headers, body, resp, started, duration):
+        entry = {
+            "at": round(started - self._start, 6),
+            "duration": round(duration, 6),
+            "method": method,
+            "url": _relative(url),
+            "request_headers": redact_headers(dict(headers or {})),
+            "request_body": _text(body),
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "response_headers": redact_headers(
+                {
+                    k: v
+                    for k, v in resp.headers.items()
+                    if k.lower() not in _WIRE_HEADERS
+                }
+            ),
+            "response_body": resp.text,
+        }
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_recording(path):
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ReplayTransport:
+    """
+    Serves recorded responses in place of the network. Requests are matched on
+    method and path+query, in recorded order. Once the recordings for a request
+    are used up, the last one is repeated, so polling loops keep working.
+
+    speed scales the recorded response times: 1.0 is the original speed, 2.0
+    twice as fast, and 0 disables the delays.
+
+    Only each response's latency is reproduced. The recorded "at" offsets are
+    not used, so requests are served as fast as the client sends them rather
+    than with the gaps between them in the original run; a replayed run is
+    paced by the client, e.g. by wait_for_sync's interval.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.speed = speed
+        self._entries = defaultdict(deque)
+        self._last = {}
+        self._lock = threading.Lock()
+        for entry in load_recording(path):
+            self._entries[(entry["method"], entry["url"])].append(entry)
+
+    def send(self, method, url, deadline=None, **kwargs):
+        key = (method, _relative(url))
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded response for {method} {key[1]}")
+
+        if self.speed:
+            delay = entry["duration"] / self.speed
+            if deadline is not None:
+                deadline.sleep(delay)
+            else:
+                time.sleep(delay)
+
+        return self._build_response(method, url, kwargs.get("headers"), entry)
+
+    @staticmethod
+    def _build_response(method, url, headers, entry):
+        import requests
+        from requests.structures import CaseInsensitiveDict
+
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason")
+        resp.headers = CaseInsensitiveDict(entry["response_headers"])
+        resp._content = (entry["response_body"] or "").encode("utf-8")
+        resp.encoding = "utf-8"
+        resp.url = url
+        resp.request = requests.Request(method, url, headers=headers).prepare()
+        return resp
@@ -0,0 +1,91 @@
+import threading
+from urllib.parse import urlsplit
+
+DEFAULT_ACCEPT_ENCODING = "gzip, deflate"
+
+# Path segments followed by an object name, collapsed so stats group per route.
+_NAMED_COLLECTIONS = {"applications", "applicationsets", "projects"}
+
+
+def route_key(method, url):
+    segments = urlsplit(url).path.split("/")
+    for i in range(1, len(segments)):
+        if segments[i - 1] in _NAMED_COLLECTIONS and segments[i]:
+            segments[i] = "{name}"
+    return f"{method} {'/'.join(segments)}"
+
+
+def gzip_body(data, min_bytes):
+    """
+    Gzip a request body if it is at least min_bytes long.
+    Returns (body, raw_size, compressed) where body is bytes.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    raw_size = len(data)
+    if min_bytes is None or raw_size < min_bytes:
+        return data, raw_size, False
+
+    import gzip
+
+    return gzip.compress(data, compresslevel=6), raw_size, True
+
+
+def response_sizes(resp):
+    """
+    Returns (wire_bytes, decoded_bytes) for a fully read response.
+    """
+    decoded = len(resp.content)
+    wire = None
+    raw = getattr(resp, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            wire = raw.tell()
+        except Exception:
+            wire = None
+    if not wire:
+        length = resp.headers.get("Content-Length")
+        wire = int(length) if length and length.isdigit() else decoded
+    return wire, decoded
+
+
+class TransferStats:
+    """
+    Per-route byte counters for request and response bodies, before and after
+    compression. Safe to update from several threads.
+    """
+
+    _FIELDS = (
+        "requests",
+        "request_bytes",
+        "request_wire_bytes",
+        "response_bytes",
+        "response_wire_bytes",
+    )
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, request_bytes, request_wire_bytes, response_sizes):
+        response_wire_bytes, response_bytes = response_sizes
+        with self._lock:
+            stats = self._routes.setdefault(route, dict.fromkeys(self._FIELDS, 0))
+            stats["requests"] += 1
+            stats["request_bytes"] += request_bytes
+            stats["request_wire_bytes"] += request_wire_bytes
+            stats["response_bytes"] += response_bytes
+            stats["response_wire_bytes"] += response_wire_bytes
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in self._routes.items()}
+        for stats in routes.values():
+            total = stats["request_bytes"] + stats["response_bytes"]
+            wire = stats["request_wire_bytes"] + stats["response_wire_bytes"]
+            stats["ratio"] = round(wire / total, 3) if total else 1.0
+        return routes
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
@@ -1,9 +1,6 @@
-import time
-import yaml
-from typing import Any, Dict, List, Tuple
-
-
 def load_yaml(data):
+    import yaml
+
     return yaml.safe_load(data)
 
 
@@ -38,7 +35,7 @@ def deep_merge(base, patch):
             base[key] = value
 
 
-def build_query_items(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+def build_query_items(params: dict) -> list:
     query_items = []
 
     for key, value in params.items():
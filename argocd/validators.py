@@ -1,5 +1,3 @@
-from typing import Dict, Set
-
 ALLOWED_QUERY_PARAMS = {
     "list_applications": {
         "name",
@@ -28,6 +26,19 @@ ALLOWED_QUERY_PARAMS = {
         "sourcePositions",
     },
     "update_application": {"validate", "project"},
+    "list_appsets": {"projects", "selector", "appsetNamespace"},
+    "get_appset": {"appsetNamespace"},
+    "delete_appset": {"appsetNamespace"},
+    "list_projects": {"name"},
+    "resource_tree": {
+        "namespace",
+        "name",
+        "version",
+        "group",
+        "kind",
+        "appNamespace",
+        "project",
+    },
     "patch_resource": {
         "namespace",
         "resourceName",
@@ -58,7 +69,7 @@ ALLOWED_SYNC_FIELDS = {
 }
 
 
-def validate_query_params(query: Dict, context: str) -> None:
+def validate_query_params(query: dict, context: str) -> None:
     allowed = ALLOWED_QUERY_PARAMS.get(context)
     if allowed is None:
         raise ValueError(f"Unknown context for validation: {context}")
@@ -72,3 +83,79 @@ def validate_sync_body(sync_body: dict):
     for key in sync_body:
         if key not in ALLOWED_SYNC_FIELDS:
             raise ValueError(f"Unsupported sync field: '{key}'")
+
+
+# Batch operations: op name -> (required args, optional args)
+BATCH_OPERATIONS = {
+    "get": ({"name"}, {"query_params"}),
+    "list": (set(), {"query_params"}),
+    "patch": ({"patch"}, {"query_params"}),
+    "patch-resource": ({"name", "patch", "query_params"}, set()),
+    "sync": ({"name", "sync_body"}, set()),
+    "wait": ({"name"}, {"timeout", "interval"}),
+    "appset-upsert": ({"appset_name", "appset_spec"}, set()),
+}
+
+BATCH_QUERY_CONTEXTS = {
+    "get": "get_application",
+    "list": "list_applications",
+    "patch": "update_application",
+    "patch-resource": "patch_resource",
+}
+
+
+def validate_operation(operation: dict) -> None:
+    if not isinstance(operation, dict):
+        raise ValueError("Operation must be a mapping.")
+
+    op_id = operation.get("id")
+    if not op_id or not isinstance(op_id, str):
+        raise ValueError(f"Operation is missing a string 'id': {operation}")
+
+    op = operation.get("op")
+    if op not in BATCH_OPERATIONS:
+        raise ValueError(f"Unsupported operation '{op}' for '{op_id}'")
+
+    args = operation.get("args", {})
+    if not isinstance(args, dict):
+        raise ValueError(f"'args' must be a mapping for '{op_id}'")
+
+    required, optional = BATCH_OPERATIONS[op]
+    missing = required - set(args)
+    if missing:
+        raise ValueError(f"Missing args {sorted(missing)} for '{op_id}' ({op})")
+    for key in args:
+        if key not in required and key not in optional:
+            raise ValueError(f"Unsupported arg '{key}' for '{op_id}' ({op})")
+
+    depends_on = operation.get("depends_on", [])
+    if not isinstance(depends_on, list) or not all(
+        isinstance(dep, str) for dep in depends_on
+    ):
+        raise ValueError(f"'depends_on' must be a list of ids for '{op_id}'")
+
+    if "query_params" in args:
+        query_params = args["query_params"] or {}
+        if not isinstance(query_params, dict):
+            raise ValueError(f"'query_params' must be a mapping for '{op_id}'")
+        validate_query_params(query_params, BATCH_QUERY_CONTEXTS[op])
+    if op == "patch":
+        patch = args["patch"]
+        if not isinstance(patch, dict) or not (patch.get("metadata") or {}).get("name"):
+            raise ValueError(
+                f"'patch' must be a mapping with metadata.name for '{op_id}'"
+            )
+    if op == "patch-resource":
+        if not args["patch"] or not isinstance(args["patch"], str):
+            raise ValueError(f"'patch' must be a raw JSON or YAML string for '{op_id}'")
+    if op == "sync":
+        if not isinstance(args["sync_body"], dict):
+            raise ValueError(f"'sync_body' must be a mapping for '{op_id}'")
+        validate_sync_body(args["sync_body"])
+    if op == "wait":
+        for key in ("timeout", "interval"):
+            value = args.get(key, 1)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"'{key}' must be a number for '{op_id}'")
+            if value <= 0:
+                raise ValueError(f"'{key}' must be positive for '{op_id}'")
@@ -0,0 +1,74 @@
+"""
+Cold-start benchmark for `from argocd import ArgoCDClient`.
+
+Usage:
+    python benchmarks/bench_import.py --runs 20 --max-ms 50
+
+Each run imports the package in a fresh interpreter and reports the time
+spent in the import itself. Also fails if heavy optional dependencies are
+imported before they are needed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["requests", "yaml", "urllib3"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+from argocd import ArgoCDClient
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--max-ms", type=float, help="Fail if the median import time is higher."
+    )
+    args = parser.parse_args(argv)
+
+    samples = [run_once() for _ in range(args.runs)]
+    times = [s["ms"] for s in samples]
+    loaded = sorted({m for s in samples for m in s["loaded"]})
+
+    print(
+        f"from argocd import ArgoCDClient: median {statistics.median(times):.2f} ms, "
+        f"min {min(times):.2f} ms, max {max(times):.2f} ms ({args.runs} runs)"
+    )
+
+    failed = False
+    if loaded:
+        print(f"Heavy modules loaded at import: {', '.join(loaded)}")
+        failed = True
+    if args.max_ms is not None and statistics.median(times) > args.max_ms:
+        print(f"Median import time is above {args.max_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
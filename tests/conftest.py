@@ -0,0 +1,61 @@
+import copy
+import json
+
+import pytest
+
+from argocd.client import ArgoCDClient
+
+COLLECTIONS = {"applications", "applicationsets", "projects"}
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return copy.deepcopy(self._body)
+
+
+class FakeHttp:
+    """
+    In-memory stand-in for HttpClient.
+
+    GETs of a collection return items; GETs of an object return it from
+    store, or default(name) when it is not there. Names in failing raise.
+    POSTs upsert into store and add a server-side default to the spec.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.items = []
+        self.failing = set()
+        self.default = lambda name: {"metadata": {"name": name}}
+        self.gets = []
+        self.posts = []
+
+    def get(self, path, deadline=None):
+        self.gets.append(path)
+        name = path.split("?")[0].rsplit("/", 1)[-1]
+        if name in self.failing:
+            raise Exception(f"{name} unavailable")
+        if name in COLLECTIONS:
+            data = {"items": self.items}
+        else:
+            data = self.store.get(name) or self.default(name)
+        return {"success": True, "status_code": 200, "data": data}
+
+    def post(self, path, payload, content_type="application/json", deadline=None):
+        self.posts.append(path)
+        body = json.loads(payload)
+        body["spec"].setdefault("goTemplate", False)
+        self.store[body["metadata"]["name"]] = copy.deepcopy(body)
+        return FakeResponse(body)
+
+
+@pytest.fixture
+def client():
+    client = ArgoCDClient("https://argocd.example", "token", None)
+    client.http = FakeHttp()
+    return client
@@ -0,0 +1,71 @@
+SPEC = {"template": {"metadata": {"labels": {"a": "1", "b": "2"}}}}
+
+
+def test_repeated_upsert_skips_post(client):
+    client.create_or_update_appset("apps", SPEC)
+    client.create_or_update_appset("apps", SPEC)
+    assert len(client.http.posts) == 1
+    assert client.http.posts[0].endswith("?upsert=true")
+
+
+def test_removed_field_is_written(client):
+    client.create_or_update_appset("apps", SPEC)
+    smaller = {"template": {"metadata": {"labels": {"a": "1"}}}}
+    client.create_or_update_appset("apps", smaller)
+    assert len(client.http.posts) == 2
+    assert (
+        "b" not in client.http.store["apps"]["spec"]["template"]["metadata"]["labels"]
+    )
+
+
+def test_upsert_after_server_side_drift_is_written(client):
+    client.create_or_update_appset("apps", SPEC)
+    client._appset_cache.clear()
+    client.http.store["apps"]["spec"]["template"]["metadata"]["labels"]["c"] = "3"
+    client.create_or_update_appset("apps", SPEC)
+    assert len(client.http.posts) == 2
+
+
+def test_fresh_client_skips_only_exact_match(client):
+    client.http.store["apps"] = {"metadata": {"name": "apps"}, "spec": SPEC}
+    client.create_or_update_appset("apps", SPEC)
+    assert client.http.posts == []
+
+    client._appset_cache.clear()
+    client.create_or_update_appset("apps", {"template": {}})
+    assert len(client.http.posts) == 1
+
+
+def test_cached_results_are_copies(client):
+    client.create_or_update_appset("apps", SPEC)
+    result = client.create_or_update_appset("apps", SPEC)
+    result["spec"]["template"] = {}
+    client.create_or_update_appset("apps", SPEC)
+    assert len(client.http.posts) == 1
+
+    project = client.get_project("default")
+    project["data"]["metadata"]["name"] = "changed"
+    assert client.get_project("default")["data"]["metadata"]["name"] == "default"
+    assert len([p for p in client.http.gets if "/projects/" in p]) == 1
+
+
+def test_apply_appsets_reads_once_per_pass(client):
+    specs = {"apps": SPEC, "infra": SPEC}
+    client.apply_appsets(specs)
+    assert len(client.http.posts) == 2
+    assert client.http.gets == ["/api/v1/applicationsets"]
+
+    # Next pass, after the cache has expired.
+    client._appset_cache.clear()
+    client.http.items = list(client.http.store.values())
+    client.http.gets.clear()
+    client.apply_appsets(specs)
+    assert len(client.http.posts) == 2
+    assert client.http.gets == ["/api/v1/applicationsets"]
+
+
+def test_applied_specs_are_bounded(client):
+    client._appset_cache.max_entries = 2
+    for name in ("a", "b", "c"):
+        client.create_or_update_appset(name, SPEC, force=True)
+    assert list(client._appset_applied) == ["b", "c"]
@@ -0,0 +1,163 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+from argocd.batch import BatchRunner, main, validate_operations
+
+
+def write_operations(tmp_path, operations, name="operations.jsonl"):
+    path = tmp_path / name
+    path.write_text("".join(json.dumps(op) + "\n" for op in operations))
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"id": "a", "op": "list", "depends_on": [{"x": 1}]},
+        {"id": "a", "op": "list", "args": {"query_params": 5}},
+        {"id": "a", "op": "wait", "args": {"name": "x", "timeout": "soon"}},
+        {"id": "a", "op": "wait", "args": {"name": "x", "interval": 0}},
+        {"id": "a", "op": "patch", "args": {"patch": {"spec": {}}}},
+        {"id": "a", "op": "patch-resource", "args": {"name": "x", "patch": {}}},
+    ],
+)
+def test_invalid_operations_are_rejected(tmp_path, operation):
+    with pytest.raises(ValueError):
+        validate_operations(write_operations(tmp_path, [operation]))
+
+
+def test_dependencies_must_be_defined_earlier(tmp_path):
+    path = write_operations(
+        tmp_path,
+        [
+            {"id": "b", "op": "list", "depends_on": ["a"]},
+            {"id": "a", "op": "list"},
+        ],
+    )
+    with pytest.raises(ValueError, match="not defined earlier"):
+        validate_operations(path)
+
+
+def test_malformed_yaml_is_reported_without_traceback(tmp_path, capsys):
+    path = tmp_path / "operations.yaml"
+    path.write_text("- id: a\n  op: [unclosed\n")
+    assert main([str(path), "--validate-only"]) == 2
+    assert "invalid YAML" in capsys.readouterr().err
+
+
+class FakeClient:
+    """
+    get_application fails for names starting with "fail" and blocks on
+    "block" until release is set.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def get_application(self, name, query_params=None):
+        with self._lock:
+            self.calls.append(name)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if name == "block":
+                self.release.wait(5)
+            else:
+                time.sleep(0.01)
+            if name.startswith("fail"):
+                raise Exception(f"{name} failed")
+            return {"name": name}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def get(op_id, name=None, depends_on=()):
+    return {
+        "id": op_id,
+        "op": "get",
+        "args": {"name": name or op_id},
+        "depends_on": list(depends_on),
+    }
+
+
+def run(operations, **kwargs):
+    client = FakeClient()
+    output = io.StringIO()
+    summary = BatchRunner(client, output, **kwargs).run(iter(operations))
+    records = {}
+    for line in output.getvalue().splitlines():
+        record = json.loads(line)
+        records[record["id"]] = record
+    return client, summary, records
+
+
+def test_runs_up_to_concurrency_at_a_time():
+    client, summary, records = run([get(f"op{i}") for i in range(12)], concurrency=3)
+    assert summary == {"ok": 12, "error": 0, "skipped": 0, "resumed": 0}
+    assert client.max_active == 3
+    assert records["op5"]["result"] == {"name": "op5"}
+
+
+def test_failed_dependencies_skip_dependents():
+    client, summary, records = run(
+        [
+            get("a", "fail-a"),
+            get("b", depends_on=["a"]),
+            get("c", depends_on=["b"]),
+            get("d"),
+            get("e", depends_on=["d"]),
+        ],
+        concurrency=2,
+    )
+    assert summary == {"ok": 2, "error": 1, "skipped": 2, "resumed": 0}
+    assert records["b"]["status"] == records["c"]["status"] == "skipped"
+    assert sorted(client.calls) == ["d", "e", "fail-a"]
+
+
+def test_dependents_wait_for_their_dependencies():
+    client, _, _ = run(
+        [get("a"), get("b", depends_on=["a"]), get("c", depends_on=["b"])],
+        concurrency=4,
+    )
+    assert client.calls == ["a", "b", "c"]
+    assert client.max_active == 1
+
+
+def test_checkpoint_resumes_only_unfinished_operations(tmp_path):
+    checkpoint = str(tmp_path / "run.checkpoint")
+    operations = [get("a"), get("b", "fail-b"), get("c", depends_on=["a"])]
+    run(operations, checkpoint_path=checkpoint)
+
+    operations[1] = get("b")
+    client, summary, _ = run(operations, checkpoint_path=checkpoint)
+    assert client.calls == ["b"]
+    assert summary == {"ok": 1, "error": 0, "skipped": 0, "resumed": 2}
+
+
+def test_read_ahead_is_bounded_by_max_pending():
+    consumed = []
+
+    def operations():
+        yield get("block")
+        for i in range(20):
+            consumed.append(i)
+            yield get(f"op{i}", depends_on=["block"])
+
+    client = FakeClient()
+    runner = BatchRunner(client, io.StringIO(), concurrency=2, max_pending=3)
+    thread = threading.Thread(target=runner.run, args=(operations(),))
+    thread.start()
+    time.sleep(0.2)
+    assert len(consumed) == 3
+    client.release.set()
+    thread.join(5)
+    assert len(consumed) == 20
@@ -0,0 +1,39 @@
+import time
+
+from argocd.cache import MISSING, TTLCache
+
+
+def test_get_returns_value_until_expired():
+    cache = TTLCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is MISSING
+    assert cache.get("a", None) is None
+
+
+def test_invalidate_and_clear():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is MISSING
+    assert cache.get("b") == 2
+    cache.clear()
+    assert cache.get("b") is MISSING
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is MISSING
+
+
+def test_full_cache_evicts_entry_expiring_first():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is MISSING
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
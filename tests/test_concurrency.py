@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from argocd.concurrency import AdaptiveLimiter
+from argocd.deadline import Deadline, DeadlineExceeded
+
+
+def run(limiter, count, latency, route="GET /a", in_flight=0, overloaded=False):
+    """Complete count requests while in_flight others are outstanding."""
+    for _ in range(in_flight):
+        limiter.acquire()
+    for _ in range(count):
+        limiter.acquire()
+        limiter.release(latency=latency, overloaded=overloaded, route=route)
+    for _ in range(in_flight):
+        limiter.release()
+
+
+def test_limit_grows_only_when_window_is_used():
+    limiter = AdaptiveLimiter(initial_limit=4)
+    run(limiter, 50, 0.01)
+    assert limiter.limit == 4
+
+    run(limiter, 50, 0.01, in_flight=3)
+    assert limiter.limit > 4
+
+
+def test_limit_is_capped_at_max():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+    run(limiter, 200, 0.01, in_flight=1)
+    run(limiter, 200, 0.01, in_flight=2)
+    assert limiter.limit == 3
+
+
+def test_overload_cuts_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial_limit=20)
+    run(limiter, 1, 10.0)  # long round trip so the cooldown stays active
+    run(limiter, 5, None, overloaded=True)
+    assert limiter.limit == 14
+    assert limiter.snapshot()["overloads"] == 5
+
+
+def test_limit_never_drops_below_min():
+    limiter = AdaptiveLimiter(initial_limit=2, min_limit=2)
+    run(limiter, 5, None, overloaded=True)
+    assert limiter.limit == 2
+
+
+def test_slow_route_does_not_look_like_a_spike():
+    limiter = AdaptiveLimiter(initial_limit=11)
+    run(limiter, 50, 0.05, route="GET /api/v1/applications/{name}")
+    run(limiter, 1, 3.0, route="GET /api/v1/applications")
+    run(limiter, 50, 0.05, route="GET /api/v1/applications/{name}")
+    assert limiter.limit == 11
+
+
+def test_sustained_latency_rise_on_a_route_cuts_limit():
+    limiter = AdaptiveLimiter(initial_limit=20)
+    run(limiter, 20, 0.001)
+    run(limiter, 10, 0.05)
+    assert limiter.limit < 20
+
+
+def test_acquire_blocks_at_limit_until_release():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+
+
+def test_acquire_respects_deadline():
+    limiter = AdaptiveLimiter(initial_limit=1)
+    limiter.acquire()
+    with pytest.raises(DeadlineExceeded):
+        limiter.acquire(Deadline(0.05))
+    assert limiter.in_flight == 1
+
+
+def test_overload_burst_on_cold_limiter_cuts_once():
+    limiter = AdaptiveLimiter()
+    run(limiter, 20, 0.002, overloaded=True)
+    assert limiter.limit == 44
+    assert limiter.snapshot()["rtt"] == pytest.approx(0.002)
+
+
+def test_overloaded_latency_spaces_out_cuts():
+    limiter = AdaptiveLimiter(initial_limit=20)
+    run(limiter, 1, 5.0, overloaded=True)
+    run(limiter, 5, 5.0, overloaded=True)
+    assert limiter.limit == 14
+
+
+class TimeoutTransport:
+    def send(self, method, url, deadline=None, **kwargs):
+        import requests
+
+        deadline.sleep(1)
+        raise requests.ReadTimeout("read timed out")
+
+
+def test_deadline_timeouts_do_not_count_as_overload():
+    from argocd.http import HttpClient
+
+    http = HttpClient("http://argocd", {}, 30, transport=TimeoutTransport())
+    for _ in range(2):
+        with pytest.raises(Exception):
+            http.get("/api/v1/applications", deadline=Deadline(0.01))
+    assert http.limiter.limit == 64
+    assert http.limiter.snapshot()["overloads"] == 0
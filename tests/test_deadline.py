@@ -0,0 +1,115 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from argocd.client import ArgoCDClient
+from argocd.deadline import Deadline, DeadlineExceeded, OperationCancelled
+from argocd.http import HttpClient
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    delay = 5.0
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        body = b'{"status": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def slow_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def cancel_after(deadline, seconds):
+    timer = threading.Timer(seconds, deadline.cancel)
+    timer.start()
+    return timer
+
+
+def test_timeout_is_capped_at_time_left():
+    deadline = Deadline(0.5)
+    assert deadline.timeout(30) <= 0.5
+    assert deadline.timeout(0.1) == 0.1
+    assert Deadline().timeout(30) == 30
+    assert Deadline().remaining() is None
+
+
+def test_check_raises_once_expired_or_cancelled():
+    deadline = Deadline(0)
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+    deadline = Deadline(10)
+    deadline.cancel()
+    with pytest.raises(OperationCancelled):
+        deadline.check()
+
+
+def test_on_cancel_runs_callbacks_once_and_can_unregister():
+    deadline = Deadline()
+    calls = []
+    deadline.on_cancel(lambda: calls.append("kept"))
+    unregister = deadline.on_cancel(lambda: calls.append("dropped"))
+    unregister()
+    deadline.cancel()
+    deadline.cancel()
+    assert calls == ["kept"]
+
+    deadline.on_cancel(lambda: calls.append("late"))
+    assert calls == ["kept", "late"]
+
+
+def test_sleep_stops_at_time_left():
+    start = time.monotonic()
+    Deadline(0.1).sleep(5)
+    assert time.monotonic() - start < 1
+
+
+def test_cancel_wakes_sleep():
+    deadline = Deadline(10)
+    cancel_after(deadline, 0.1)
+    start = time.monotonic()
+    with pytest.raises(OperationCancelled):
+        deadline.sleep(5)
+    assert time.monotonic() - start < 1
+
+
+def test_cancel_interrupts_request_in_flight(slow_server):
+    http = HttpClient(slow_server, {}, 30, adaptive_concurrency=False)
+    deadline = Deadline(30)
+    cancel_after(deadline, 0.5)
+    start = time.monotonic()
+    with pytest.raises(OperationCancelled):
+        http.get("/api/v1/applications/slow", deadline=deadline)
+    assert time.monotonic() - start < 2
+
+
+def test_deadline_running_out_in_flight_raises_deadline_exceeded(slow_server):
+    http = HttpClient(slow_server, {}, 30)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        http.get("/api/v1/applications/slow", deadline=Deadline(0.3))
+    assert time.monotonic() - start < 2
+    assert http.limiter.snapshot()["overloads"] == 0
+
+
+def test_wait_for_sync_returns_false_when_deadline_ends_mid_poll(slow_server):
+    client = ArgoCDClient(slow_server, "token", None)
+    assert client.wait_for_sync("slow", deadline=Deadline(0.3)) is False
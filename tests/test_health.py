@@ -0,0 +1,122 @@
+from argocd.health import HealthRollup, RollupCache
+
+
+def resource(name, kind="Deployment", namespace="web", sync="Synced", health="Healthy"):
+    return {
+        "group": "apps",
+        "kind": kind,
+        "namespace": namespace,
+        "name": name,
+        "status": sync,
+        "health": {"status": health},
+    }
+
+
+def test_summary_counts_by_kind_and_namespace():
+    rollup = HealthRollup()
+    rollup.update(
+        [
+            resource("a"),
+            resource("b", health="Degraded", sync="OutOfSync"),
+            resource("svc", kind="Service", namespace="api"),
+        ]
+    )
+    summary = rollup.summary()
+    assert summary["total"] == 3
+    assert summary["health"] == {"Healthy": 2, "Degraded": 1}
+    assert summary["by_kind"]["Deployment"]["sync"] == {"Synced": 1, "OutOfSync": 1}
+    assert summary["by_namespace"]["api"]["health"] == {"Healthy": 1}
+
+
+def test_update_returns_only_changes():
+    rollup = HealthRollup()
+    rollup.update([resource("a"), resource("b")])
+    assert not +rollup.update([resource("a"), resource("b")])
+
+    delta = rollup.update([resource("a", health="Degraded"), resource("b")])
+    assert delta[("all", "", "health", "Healthy")] == -1
+    assert delta[("all", "", "health", "Degraded")] == 1
+    assert delta[("all", "", "sync", "Synced")] == 0
+
+
+def test_removed_and_added_resources():
+    rollup = HealthRollup()
+    rollup.update([resource("a"), resource("b")])
+    rollup.update([resource("b"), resource("c", kind="Service")])
+    summary = rollup.summary()
+    assert summary["total"] == 2
+    assert summary["by_kind"] == {
+        "Deployment": {"sync": {"Synced": 1}, "health": {"Healthy": 1}},
+        "Service": {"sync": {"Synced": 1}, "health": {"Healthy": 1}},
+    }
+
+
+def test_tree_update_keeps_sync_and_skips_children():
+    rollup = HealthRollup()
+    rollup.update_from_status({"resources": [resource("a", sync="OutOfSync")]})
+    tree = {
+        "nodes": [
+            {
+                "group": "apps",
+                "kind": "Deployment",
+                "namespace": "web",
+                "name": "a",
+                "health": {"status": "Progressing"},
+            },
+            {"kind": "Pod", "name": "a-1", "parentRefs": [{}], "health": {}},
+        ]
+    }
+    rollup.update_from_tree(tree)
+    assert rollup.summary()["sync"] == {"OutOfSync": 1}
+    assert rollup.summary()["health"] == {"Progressing": 1}
+    assert list(rollup.unhealthy()) == [
+        ("apps", "Deployment", "web", "a", "OutOfSync", "Progressing")
+    ]
+
+
+def test_fleet_follows_app_updates():
+    cache = RollupCache()
+    cache.update_from_status("one", {"resources": [resource("a"), resource("b")]})
+    cache.update_from_status("two", {"resources": [resource("c")]})
+    cache.update_from_status("one", {"resources": [resource("a", health="Missing")]})
+    fleet = cache.fleet_summary()
+    assert fleet["apps"] == 2
+    assert fleet["health"] == {"Healthy": 1, "Missing": 1}
+
+    cache.retain(["two"])
+    fleet = cache.fleet_summary()
+    assert fleet["apps"] == 1
+    assert fleet["total"] == 1
+
+
+def app_status(name):
+    return {"status": {"resources": [resource(name)]}}
+
+
+def test_fleet_rollup_skips_unnamed_items(client):
+    client.http.items = [
+        {"metadata": {"name": "a"}, "status": {"resources": [resource("x")]}},
+        {"metadata": {}, "status": {"resources": [resource("y")]}},
+    ]
+    summary = client.get_fleet_health_rollup()
+    assert summary["apps"] == 1
+    assert summary["total"] == 1
+
+
+def test_failed_apps_are_dropped_from_fleet(client):
+    client.http.default = app_status
+    client.get_fleet_health_rollup(app_names=["a", "b"])
+
+    client.http.failing = {"b"}
+    summary = client.get_fleet_health_rollup(app_names=["a", "b"])
+    assert summary["apps"] == 1
+    assert summary["total"] == 1
+    assert summary["errors"] == {"b": "b unavailable"}
+
+
+def test_fleet_is_limited_to_requested_apps(client):
+    client.http.default = app_status
+    client.get_fleet_health_rollup(app_names=["a", "b"])
+    summary = client.get_fleet_health_rollup(app_names=["c"])
+    assert summary["apps"] == 1
+    assert summary["total"] == 1
@@ -0,0 +1,106 @@
+import pytest
+
+from argocd.query import AppQuery, compile_selector
+
+
+def make_app(labels=None, project="default", health="Healthy", namespace="web"):
+    return {
+        "metadata": {"name": "app", "labels": labels or {}},
+        "spec": {
+            "project": project,
+            "destination": {"namespace": namespace},
+            "source": {"repoURL": "https://git/repo", "targetRevision": "v1.2"},
+        },
+        "status": {"health": {"status": health}, "sync": {"status": "Synced"}},
+    }
+
+
+@pytest.mark.parametrize(
+    "selector, labels, expected",
+    [
+        ("env=prod", {"env": "prod"}, True),
+        ("env==prod", {"env": "dev"}, False),
+        ("env!=prod", {}, True),
+        ("env in (prod, stage)", {"env": "stage"}, True),
+        ("env notin (prod,stage)", {"env": "prod"}, False),
+        ("env notin (prod)", {}, True),
+        ("team", {"team": "x"}, True),
+        ("!legacy", {"legacy": "true"}, False),
+        ("env in (prod,stage),tier!=db,!legacy", {"env": "prod", "tier": "web"}, True),
+        ("", {}, True),
+    ],
+)
+def test_compile_selector(selector, labels, expected):
+    assert compile_selector(selector)(make_app(labels)) is expected
+
+
+@pytest.mark.parametrize("selector", ["env in prod", "env=(x)", "a b"])
+def test_compile_selector_rejects_invalid(selector):
+    with pytest.raises(ValueError):
+        compile_selector(selector)
+
+
+def test_server_filters_are_pushed_down():
+    query = AppQuery(
+        selector="env=prod",
+        where={"project": "default", "repo": "https://git/repo", "health": "Degraded"},
+    )
+    assert query.server_params == {
+        "selector": "env=prod",
+        "projects": ["default"],
+        "repo": "https://git/repo",
+    }
+    # Only the health predicate is applied locally.
+    assert len(query._predicates) == 1
+
+
+def test_server_params_narrow_caller_params():
+    query = AppQuery(selector="env=prod", where={"project": ["a", "b"]})
+    merged = query.merge_server_params({"selector": "team=a", "projects": ["b", "c"]})
+    assert merged == {"selector": "team=a,env=prod", "projects": ["b"]}
+    assert query.merge_server_params(None) == query.server_params
+
+
+@pytest.mark.parametrize(
+    "where, params",
+    [
+        ({"project": "a"}, {"projects": "b"}),
+        ({"repo": "https://git/one"}, {"repo": "https://git/two"}),
+    ],
+)
+def test_conflicting_server_params_raise(where, params):
+    with pytest.raises(ValueError):
+        AppQuery(where=where).merge_server_params(params)
+
+
+def test_query_applications_keeps_caller_selector(client):
+    list(client.query_applications("env=prod", {"selector": "team=a"}))
+    assert "selector=team%3Da%2Cenv%3Dprod" in client.http.gets[-1]
+
+
+def test_callable_predicates_are_not_pushed_down():
+    query = AppQuery(where={"project": lambda p: p.startswith("team-")})
+    assert query.server_params == {}
+    assert query.matches(make_app(project="team-a"))
+    assert not query.matches(make_app(project="default"))
+
+
+def test_filter_applies_local_predicates_only():
+    query = AppQuery(
+        selector="env=prod",
+        where={"health": "Degraded", "namespace": ["web", "api"]},
+    )
+    items = [
+        make_app({"env": "dev"}, health="Degraded"),
+        make_app({"env": "prod"}, health="Healthy"),
+        make_app({"env": "prod"}, health="Degraded", namespace="db"),
+    ]
+    # filter() trusts the server for the selector; matches() checks it too.
+    assert list(query.filter(items)) == [items[0]]
+    assert [query.matches(item) for item in items] == [False, False, False]
+
+
+def test_missing_fields_do_not_match():
+    query = AppQuery(where={"operation": "Running"})
+    assert not query.matches(make_app())
+    assert AppQuery(where={"revision": lambda r: r is None}).matches({})
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from argocd.http import HttpClient
+from argocd.recording import Recorder, ReplayMiss, ReplayTransport, load_recording
+
+
+class StaticTransport:
+    """
+    Answers every request with the same JSON body.
+    """
+
+    def __init__(self, body):
+        self.body = body
+
+    def send(self, method, url, deadline=None, **kwargs):
+        import requests
+
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = "OK"
+        resp.headers["Content-Type"] = "application/json"
+        resp.headers["Set-Cookie"] = "argocd.token=secret"
+        resp._content = json.dumps(self.body).encode("utf-8")
+        resp.url = url
+        resp.request = requests.Request(
+            method, url, headers=kwargs["headers"]
+        ).prepare()
+        return resp
+
+
+class Logger:
+    def debug(self, message):
+        pass
+
+
+def make_http(**kwargs):
+    return HttpClient(
+        "https://argocd.example",
+        {"Authorization": "Bearer secret-token"},
+        30,
+        logger=Logger(),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize("name", ["traffic.jsonl", "traffic.jsonl.gz"])
+def test_record_and_replay_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    body = {"metadata": {"name": "guestbook"}}
+    with Recorder(path) as recorder:
+        http = make_http(recorder=recorder, transport=StaticTransport(body))
+        http.get("/api/v1/applications/guestbook")
+        http.post("/api/v1/applications/guestbook/sync", '{"prune": true}')
+
+    entries = list(load_recording(path))
+    assert [(e["method"], e["url"]) for e in entries] == [
+        ("GET", "/api/v1/applications/guestbook"),
+        ("POST", "/api/v1/applications/guestbook/sync"),
+    ]
+    assert entries[0]["request_headers"]["Authorization"] == "***REDACTED***"
+    assert "secret" not in json.dumps(entries)
+
+    http = make_http(transport=ReplayTransport(path, speed=0))
+    assert http.get("/api/v1/applications/guestbook")["data"] == body
+    # Used-up recordings are repeated for polling loops.
+    assert http.get("/api/v1/applications/guestbook")["data"] == body
+    assert http.post("/api/v1/applications/guestbook/sync", "{}").json() == body
+    with pytest.raises(ReplayMiss):
+        http.get("/api/v1/projects/default")
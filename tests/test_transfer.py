@@ -0,0 +1,41 @@
+import gzip
+
+from argocd.transfer import TransferStats, gzip_body, route_key
+
+
+def test_gzip_body_respects_threshold():
+    body = "x" * 100
+    assert gzip_body(body, None) == (body.encode(), 100, False)
+    assert gzip_body(body, 101) == (body.encode(), 100, False)
+
+    data, raw_size, compressed = gzip_body(body, 100)
+    assert compressed and raw_size == 100
+    assert len(data) < 100
+    assert gzip.decompress(data) == body.encode()
+
+
+def test_route_key_collapses_object_names():
+    assert (
+        route_key("GET", "https://argocd/api/v1/applications/guestbook?refresh=hard")
+        == "GET /api/v1/applications/{name}"
+    )
+    assert route_key("GET", "https://argocd/api/v1/applications") == (
+        "GET /api/v1/applications"
+    )
+
+
+def test_transfer_stats_track_wire_and_decoded_bytes():
+    stats = TransferStats()
+    route = "POST /api/v1/applicationsets"
+    stats.record(route, 1000, 200, (300, 1800))
+    stats.record(route, 0, 0, (100, 200))
+    snapshot = stats.snapshot()[route]
+    assert snapshot["requests"] == 2
+    assert snapshot["request_bytes"] == 1000
+    assert snapshot["request_wire_bytes"] == 200
+    assert snapshot["response_bytes"] == 2000
+    assert snapshot["response_wire_bytes"] == 400
+    assert snapshot["ratio"] == 0.2
+
+    stats.reset()
+    assert stats.snapshot() == {}